@@ -8,6 +8,9 @@ PROCESSED_DIR = DATA_DIR / "processed"
 # Main processed panel file
 PANEL_PATH = PROCESSED_DIR / "panel_2010_2020.csv"
 
+# Columnar cache of the panel with frozen dtypes (written by design.load_panel)
+PANEL_PARQUET = PROCESSED_DIR / "panel_2010_2020.parquet"
+
 # DID design parameters (can be used later in models)
 TREATMENT_YEAR = 2015
 PRE_PERIOD_START = 2010
@@ -1,5 +1,116 @@
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-from .config import PANEL_PATH
+from .config import PANEL_PATH, PANEL_PARQUET
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain numpy
+    njit = None
+
+try:
+    import numexpr as ne
+except ImportError:  # numexpr is optional; fall back to plain numpy
+    ne = None
+
+
+def _group_diff_numpy(codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    First difference of values within consecutive runs of equal codes.
+
+    Rows must be sorted so that each group is contiguous. The first row
+    of every group gets NaN.
+    """
+    if len(values) == 0:
+        return values.astype(float)
+    out = np.r_[np.nan, np.diff(values)]
+    out[1:][codes[1:] != codes[:-1]] = np.nan
+    return out
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _group_diff(codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        out = np.empty(values.shape[0], dtype=np.float64)
+        if values.shape[0] == 0:
+            return out
+        out[0] = np.nan
+        for i in range(1, values.shape[0]):
+            if codes[i] == codes[i - 1]:
+                out[i] = values[i] - values[i - 1]
+            else:
+                out[i] = np.nan
+        return out
+else:
+    _group_diff = _group_diff_numpy
+
+def _factorize(values: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    """
+    Integer codes and unique values of a column.
+
+    Categorical columns (see prepare_analysis_panel) reuse their codes
+    instead of hashing the values again.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.cat.remove_unused_categories()
+        return values.cat.codes.to_numpy(dtype=np.intp), values.cat.categories
+    codes, uniques = pd.factorize(values)
+    return codes, pd.Index(uniques)
+
+
+def _freeze_panel_dtypes(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcast raw panel columns to compact dtypes:
+    'region' as category, 'year' as int16, other integers as int32
+    and floats as float32.
+    """
+    dtypes = {"region": "category", "year": np.int16}
+    for col, dtype in panel.dtypes.items():
+        if col in dtypes:
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            dtypes[col] = np.int32
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = np.float32
+    return panel.astype(dtypes)
+
+
+def load_panel() -> pd.DataFrame:
+    """
+    Load the raw processed panel.
+
+    Reads the Parquet cache (PANEL_PARQUET) when it exists and is not older
+    than the CSV (PANEL_PATH). Otherwise the CSV is parsed, downcast to
+    compact dtypes and written to Parquet for the next call. Without a
+    Parquet engine (pyarrow), or if the cache cannot be read or written,
+    the CSV is used; a corrupt cache is overwritten.
+
+    Returns
+    --------
+    pd.DataFrame
+        Raw panel with 'region' as category and 'year' as int16.
+    """
+    csv_mtime = PANEL_PATH.stat().st_mtime
+    if PANEL_PARQUET.exists() and PANEL_PARQUET.stat().st_mtime >= csv_mtime:
+        try:
+            return pd.read_parquet(PANEL_PARQUET, engine="pyarrow")
+        except (ImportError, OSError, ValueError):
+            # No engine, unreadable or corrupt cache (pyarrow.ArrowInvalid
+            # is a ValueError): rebuild it from the CSV below
+            pass
+
+    panel = _freeze_panel_dtypes(pd.read_csv(PANEL_PATH))
+
+    # The cache is best effort: a read-only or full disk must not break loading
+    try:
+        panel.to_parquet(PANEL_PARQUET, engine="pyarrow", index=False)
+    except (ImportError, OSError):
+        pass
+
+    return panel
+
 
 def add_crime_rate_if_missing(panel: pd.DataFrame) -> pd.DataFrame:
     """
@@ -13,17 +124,28 @@ def add_crime_rate_if_missing(panel: pd.DataFrame) -> pd.DataFrame:
     - 'total_cases'
     - 'population_total'
 
+    The column is added in place, so pass a dataframe you own
+    (prepare_analysis_panel copies once for the whole pipeline).
+
     Returns
     --------
     pd.DataFrame
-        A copy of the input with the new crime_rate_per_100k columns.
+        The input with the new crime_rate_per_100k column.
     """
-    df = panel.copy()
+    df = panel
 
     if "crime_rate_per_100k" not in df.columns:
-        df["crime_rate_per_100k"] = (
-            df["total_cases"] / df["population_total"] * 100_000
-        )
+        tc = df["total_cases"].to_numpy(dtype=np.float32)
+        pt = df["population_total"].to_numpy(dtype=np.float32)
+        scale = np.float32(100_000)
+
+        # numexpr fuses the division and scaling into a single pass
+        if ne is not None:
+            rate = ne.evaluate("tc / pt * scale")
+        else:
+            rate = tc / pt * scale
+
+        df["crime_rate_per_100k"] = rate
 
     return df
 
@@ -41,39 +163,52 @@ def add_treatment_variables(panel: pd.DataFrame) -> pd.DataFrame:
     - 'region'
     - 'foreigners_total'
 
+    The columns are added in place, so pass a dataframe you own
+    (prepare_analysis_panel copies once for the whole pipeline).
+
     Returns
     --------
     pd.DataFrame
-        A copy of the input with the new DID variables
+        The input with the new DID variables
     """
-    df = panel.copy()
+    df = panel
+    region_codes, regions = _factorize(df["region"])
+    year = df["year"].to_numpy()
+    foreigners = df["foreigners_total"].to_numpy(dtype=float)
 
-    # Change in the number of foreign residents by region over time
-    df["treatment_intensity"] = df.groupby("region")["foreigners_total"].diff()
+    # Change in the number of foreign residents by region over time:
+    # sort by (region, year) so each region is contiguous, then difference
+    order = np.lexsort((year, region_codes))
+    diff = _group_diff(region_codes[order].astype(np.int64), foreigners[order])
 
-    # Threshold based on the distribution of treatment_intensity in 2016
-    threshold = df.loc[df['year'] == 2016, 'treatment_intensity'].median().astype(int)
+    treatment_intensity = np.empty_like(diff)
+    treatment_intensity[order] = diff
+    df["treatment_intensity"] = treatment_intensity
 
-    treated_regions = (
-        df.loc[df['year'] == 2016]
-        .assign(treated=lambda d: d['treatment_intensity'] > threshold)
-        .set_index('region')['treated']
-    )
+    # Threshold based on the distribution of treatment_intensity in 2016
+    mask_2016 = year == 2016
+    ti_2016 = treatment_intensity[mask_2016]
+    threshold = int(np.nanmedian(ti_2016))
 
-    # Map region > treated flag
-    df['treated'] = df['region'].map(treated_regions).fillna(0).astype(int)
+    # Region > treated flag, scattered from the 2016 rows
+    treated_per_region = np.zeros(len(regions), dtype=np.int8)
+    treated_per_region[region_codes[mask_2016]] = ti_2016 > threshold
+    df["treated"] = treated_per_region[region_codes]
 
     # Post-period indicator
-    df['post'] = (df['year'] >= 2016).astype(int)
+    df["post"] = (year >= 2016).astype(int)
 
     # DID interaction
-    df['did'] = df['treated'] * df['post']
+    df["did"] = df["treated"] * df["post"]
 
     return df
 
 def prepare_analysis_panel(panel: pd.DataFrame) -> pd.DataFrame:
     """
     Prepare the main analysis panel:
+    - store 'region' as category and 'year' as int16, so downstream code
+      reuses the region codes instead of re-hashing names
+    - add crime_rate_per_100k if missing
     - add DID design variables (treated, post, did)
 
     Parameters
@@ -85,9 +220,31 @@ def prepare_analysis_panel(panel: pd.DataFrame) -> pd.DataFrame:
     Returns
     ----------
     pd.DataFrame
-        Prepared panel ready for modeling and plotting.
+        Prepared panel ready for modeling and plotting. The input is
+        copied once here and left unchanged.
     """
-    df = panel.copy()
+    df = panel.astype({"region": "category", "year": np.int16})
     df = add_crime_rate_if_missing(df)
     df = add_treatment_variables(df)
     return df
+
+
+@lru_cache(maxsize=4)
+def _load_and_prepare_cached(path: Path, mtime_ns: int) -> pd.DataFrame:
+    # Arguments only form the cache key, so edits to the file invalidate it
+    return prepare_analysis_panel(load_panel())
+
+
+def load_and_prepare() -> pd.DataFrame:
+    """
+    Load the processed panel and prepare it for analysis.
+
+    The prepared panel is cached per (PANEL_PATH, modification time), so
+    repeated calls skip the pipeline until the CSV changes.
+
+    Returns
+    ----------
+    pd.DataFrame
+        A copy of the cached prepared panel, safe to modify.
+    """
+    return _load_and_prepare_cached(PANEL_PATH, PANEL_PATH.stat().st_mtime_ns).copy()
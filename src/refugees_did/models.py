@@ -1,12 +1,320 @@
+from __future__ import annotations
+
+import warnings
+from typing import Literal, NamedTuple, get_args
+
 import pandas as pd
 import numpy as np
-import statsmodels.formula.api as smf
-from statsmodels.regression.linear_model import RegressionResults
+from scipy import linalg, stats
+
+from .design import _factorize
+
+
+# Lightweight OLS
+
+class OLSResults(NamedTuple):
+    """
+    Minimal OLS results with the statsmodels attributes used downstream:
+    'params', 'bse', 'pvalues' and 'conf_int()'.
+
+    Inference uses the normal distribution, as statsmodels does for
+    robust (HC) covariance types, or Student's t with df_resid degrees
+    of freedom when use_t is set (classical standard errors).
+    """
+    params: pd.Series
+    bse: pd.Series
+    pvalues: pd.Series
+    nobs: int
+    df_resid: int
+    use_t: bool = False
+
+    def conf_int(self, alpha: float = 0.05) -> pd.DataFrame:
+        """Confidence intervals for all parameters (columns 0 and 1)."""
+        if self.use_t:
+            q = stats.t.ppf(1 - alpha / 2, self.df_resid)
+        else:
+            q = stats.norm.ppf(1 - alpha / 2)
+        return pd.DataFrame(
+            {0: self.params - q * self.bse, 1: self.params + q * self.bse}
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """Coefficient table similar to the statsmodels summary."""
+        conf = self.conf_int()
+        stat = "t" if self.use_t else "z"
+        return pd.DataFrame(
+            {
+                "coef": self.params,
+                "std err": self.bse,
+                stat: self.params / self.bse,
+                f"P>|{stat}|": self.pvalues,
+                "[0.025": conf[0],
+                "0.975]": conf[1],
+            }
+        )
+
+
+SEType = Literal["HC3", "classical", "none"]
+
+
+def _check_se(se: str) -> None:
+    """Reject unknown se options instead of silently falling back to HC3."""
+    if se not in get_args(SEType):
+        raise ValueError(f"se must be one of {get_args(SEType)}, got {se!r}")
+
+
+def _ols_fit(
+    X: np.ndarray,
+    y: np.ndarray,
+    h_absorbed: np.ndarray | None = None,
+    se: SEType = "HC3",
+    df_resid: int | None = None,
+    x_scale: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fit OLS on a design matrix and compute the coefficient covariance matrix.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        Design matrix of shape (n, k).
+    y : np.ndarray
+        Outcome vector of length n.
+    h_absorbed : np.ndarray, optional
+        Leverage of absorbed fixed effects. When X and y are within-transformed,
+        the full hat-matrix diagonal is h_absorbed + diag(X (X'X)^-1 X').
+        Only used for HC3.
+    se : {"HC3", "classical", "none"}, default "HC3"
+        Covariance estimator. "classical" assumes homoskedastic errors and
+        needs no leverage; "none" skips the covariance (all NaN).
+    df_resid : int, optional
+        Residual degrees of freedom for "classical", accounting for absorbed
+        fixed effects. Defaults to n - k.
+    x_scale : np.ndarray, optional
+        Column norms of X before any fixed effects were absorbed, used to
+        detect regressors that the fixed effects explain. Defaults to the
+        column norms of X.
+
+    Returns
+    -------
+    beta : np.ndarray
+        Coefficient vector of length k. Columns that are collinear with
+        earlier columns (or with the absorbed fixed effects) get NaN, as
+        do their rows and columns in cov.
+    cov : np.ndarray
+        Covariance matrix of shape (k, k).
+    """
+    _check_se(se)
+
+    # Single precision halves memory traffic; k is small and well conditioned
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+
+    # One QR factorization serves the fit, the leverage and the sandwich,
+    # so (X'X)^-1 is never formed explicitly
+    Q, R = np.linalg.qr(X)
+
+    # A collinear column leaves a (near) zero on the diagonal of R
+    if x_scale is None:
+        x_scale = np.linalg.norm(X, axis=0)
+    tol = max(X.shape) * np.finfo(X.dtype).eps
+    keep = np.abs(np.diag(R)) > tol * x_scale
+    if not keep.all():
+        k = X.shape[1]
+        beta = np.full(k, np.nan, dtype=X.dtype)
+        cov = np.full((k, k), np.nan, dtype=X.dtype)
+        if keep.any():
+            if df_resid is not None:
+                df_resid += k - keep.sum()
+            beta[keep], cov[np.ix_(keep, keep)] = _ols_fit(
+                X[:, keep], y, h_absorbed, se, df_resid, x_scale[keep]
+            )
+        return beta, cov
+
+    beta = linalg.solve_triangular(R, Q.T @ y)
+
+    if se == "none":
+        return beta, np.full((X.shape[1], X.shape[1]), np.nan, dtype=X.dtype)
+
+    e = y - X @ beta
+
+    if se == "classical":
+        if df_resid is None:
+            df_resid = X.shape[0] - X.shape[1]
+        # sigma^2 (X'X)^-1 = sigma^2 R^-1 R^-T
+        R_inv = linalg.solve_triangular(R, np.eye(X.shape[1], dtype=X.dtype))
+        return beta, (e @ e) / df_resid * (R_inv @ R_inv.T)
+
+    # Leverage (hat-matrix diagonal) = row sums of squares of Q
+    h = np.einsum("ij,ij->i", Q, Q)
+    if h_absorbed is not None:
+        h = h + h_absorbed.astype(np.float32)
+
+    # (X'X)^-1 X'WX (X'X)^-1 = R^-1 (Q'WQ) R^-T
+    w = (e / (1 - h)) ** 2
+    meat = Q.T @ (w[:, None] * Q)
+    half = linalg.solve_triangular(R, meat)
+    cov = linalg.solve_triangular(R, half.T).T
+    return beta, cov
+
+
+def _make_results(
+    names: list[str],
+    beta: np.ndarray,
+    cov: np.ndarray,
+    nobs: int,
+    df_resid: int,
+    use_t: bool = False,
+) -> OLSResults:
+    """Wrap coefficient estimates and covariance into an OLSResults."""
+    bse = np.sqrt(np.diag(cov))
+    if use_t:
+        pvalues = 2 * stats.t.sf(np.abs(beta / bse), df_resid)
+    else:
+        pvalues = 2 * stats.norm.sf(np.abs(beta / bse))
+    return OLSResults(
+        params=pd.Series(beta, index=names),
+        bse=pd.Series(bse, index=names),
+        pvalues=pd.Series(pvalues, index=names),
+        nobs=nobs,
+        df_resid=df_resid,
+        use_t=use_t,
+    )
+
+
+# Two-way fixed effects (within transformation)
+
+def _group_demean(X: np.ndarray, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Subtract group means from each column of X; also return the means."""
+    counts = np.bincount(codes)
+    means = np.column_stack(
+        [np.bincount(codes, weights=col, minlength=len(counts)) for col in X.T]
+    ) / counts[:, None]
+    step = means[codes]
+    return X - step, step
+
+
+def _demean_twoway(
+    X: np.ndarray,
+    codes1: np.ndarray,
+    codes2: np.ndarray | None = None,
+    tol: float = 1e-8,
+    max_iter: int = 1_000,
+) -> np.ndarray:
+    """
+    Remove two-way fixed effects from the columns of X by alternating projections.
+
+    Group means by codes1 and codes2 are subtracted in turn until the largest
+    change falls below tol. For a balanced panel this converges after
+    a single sweep. With codes2=None only the first fixed effect is removed.
+    Warns if max_iter sweeps do not reach tol, since the result is then
+    only partially demeaned.
+
+    Returns
+    -------
+    np.ndarray
+        Within-transformed columns of X.
+    """
+    out = np.asarray(X, dtype=float).reshape(len(codes1), -1)
+    if codes2 is None:
+        return _group_demean(out, codes1)[0]
+
+    for _ in range(max_iter):
+        out = _group_demean(out, codes1)[0]
+        out, step = _group_demean(out, codes2)
+        if np.abs(step).max() < tol:
+            break
+    else:
+        warnings.warn(
+            f"Fixed effects not fully absorbed after {max_iter} iterations "
+            f"(last change {np.abs(step).max():.3g} > tol={tol:g})",
+            stacklevel=2,
+        )
+
+    return out
+
+
+def _twoway_fe_leverage(
+    codes1: np.ndarray,
+    codes2: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Hat-matrix diagonal of the two-way fixed-effects dummies.
+
+    Built from the (G1 + G2) x (G1 + G2) cross-product of the dummy matrix,
+    which only needs group counts, so the n x (G1 + G2) dummies are never
+    materialized. With codes2=None this is 1 / group size.
+    """
+    if codes2 is None:
+        return 1.0 / np.bincount(codes1)[codes1]
+
+    n1 = codes1.max() + 1
+    n2 = codes2.max() + 1
+
+    DtD = np.zeros((n1 + n2, n1 + n2))
+    np.add.at(DtD, (codes1, codes1), 1)
+    np.add.at(DtD, (n1 + codes2, n1 + codes2), 1)
+    np.add.at(DtD, (codes1, n1 + codes2), 1)
+    np.add.at(DtD, (n1 + codes2, codes1), 1)
+
+    # Dummies for both dimensions are collinear, hence the pseudo-inverse
+    G = np.linalg.pinv(DtD)
+    j = n1 + codes2
+    return G[codes1, codes1] + G[j, j] + 2 * G[codes1, j]
+
+
+def _fit_twoway_fe(
+    panel: pd.DataFrame,
+    outcome: str,
+    regressors: list[str],
+    fe1: str = "region",
+    fe2: str | None = "year",
+    se: SEType = "HC3",
+) -> OLSResults:
+    """
+    Fit outcome ~ regressors + C(fe1) + C(fe2) with HC3 standard errors
+    by absorbing both fixed effects instead of expanding them into dummies.
+    With fe2=None only C(fe1) is absorbed. See _ols_fit for other se options.
+
+    Regressors spanned by the fixed effects (e.g. a region-level 'treated'
+    flag) are not identified; their coefficient, SE and p-value are NaN.
+    Rows with missing values in any used column are dropped, as patsy does.
+    """
+    _check_se(se)
+
+    fe_cols = [fe1] if fe2 is None else [fe1, fe2]
+    df = panel[[outcome, *regressors, *fe_cols]].dropna()
+    n = len(df)
+
+    codes1 = _factorize(df[fe1])[0]
+    codes2 = None if fe2 is None else _factorize(df[fe2])[0]
+
+    raw = df[[outcome, *regressors]].to_numpy(dtype=float)
+    demeaned = _demean_twoway(raw, codes1, codes2)
+    y = demeaned[:, 0]
+    X = demeaned[:, 1:]
+
+    h_fe = _twoway_fe_leverage(codes1, codes2) if se == "HC3" else None
+
+    # Absorbed parameters: intercept + (G1 - 1) + (G2 - 1)
+    n_absorbed = codes1.max() + 1
+    if codes2 is not None:
+        n_absorbed += codes2.max()
+    df_resid = n - len(regressors) - n_absorbed
+
+    beta, cov = _ols_fit(
+        X, y, h_absorbed=h_fe, se=se, df_resid=df_resid,
+        x_scale=np.linalg.norm(raw[:, 1:], axis=0),
+    )
+
+    return _make_results(
+        regressors, beta, cov, n, df_resid, use_t=(se == "classical")
+    )
 
 
 # Core DID models
 
-def fit_baseline_did(panel: pd.DataFrame) -> RegressionResults:
+def fit_baseline_did(panel: pd.DataFrame) -> OLSResults:
     """
     Fit a simple DID model without fixed effects.
 
@@ -22,23 +330,26 @@ def fit_baseline_did(panel: pd.DataFrame) -> RegressionResults:
 
     Returns
     --------
-    RegressionResults
+    OLSResults
         Fitted OLS model with robust (HC3) standard errors.
     """
+    n = len(panel)
+    X = np.column_stack([np.ones(n), panel["did"].to_numpy()]).astype(np.float32)
+    y = panel["crime_rate_per_100k"].to_numpy(dtype=np.float32)
 
-    model = smf.ols(
-        formula="crime_rate_per_100k ~ did",
-        data=panel,
-    ).fit(cov_type="HC3")
-    return model
+    beta, cov = _ols_fit(X, y)
+    return _make_results(["Intercept", "did"], beta, cov, n, n - 2)
 
-def fit_main_did(panel: pd.DataFrame) -> RegressionResults:
+def fit_main_did(panel: pd.DataFrame) -> OLSResults:
     """
     Fit the main DID model with region and year fixed effects.
 
     Model:
         crime_rate_per_100k ~ did + C(region) + C(year)
 
+    Region and year fixed effects are absorbed by a within transformation,
+    so only the 'did' coefficient is reported.
+
     Parameters
     ----------
     panel : pd.DataFrame
@@ -50,17 +361,13 @@ def fit_main_did(panel: pd.DataFrame) -> RegressionResults:
 
     Returns
     -------
-    RegressionResults
+    OLSResults
         Fitted OLS model with robust (HC3) standard errors.
     """
-    model = smf.ols(
-        formula="crime_rate_per_100k ~ did + C(region) + C(year)",
-        data=panel,
-    ).fit(cov_type="HC3")
-    return model
+    return _fit_twoway_fe(panel, "crime_rate_per_100k", ["did"])
 
 
-def fit_did_with_covariates(panel: pd.DataFrame) -> RegressionResults:
+def fit_did_with_covariates(panel: pd.DataFrame) -> OLSResults:
     """
     Fit a DID model with additional controls and fixed effects.
 
@@ -71,6 +378,7 @@ def fit_did_with_covariates(panel: pd.DataFrame) -> RegressionResults:
             + C(region) + C(year)
 
     Adjust the covariate names to your actual column names if needed.
+    Region and year fixed effects are absorbed by a within transformation.
 
     Parameters
     ----------
@@ -85,28 +393,21 @@ def fit_did_with_covariates(panel: pd.DataFrame) -> RegressionResults:
 
     Returns
     -------
-    RegressionResults
+    OLSResults
         Fitted OLS model with robust (HC3) standard errors.
     """
-    formula = """
-        crime_rate_per_100k ~ did
-        + ilo_unemployment_rate_pct
-        + foreigners_share_pct
-        + C(region)
-        + C(year)
-    """
-
-    model = smf.ols(
-        formula=formula,
-        data=panel,
-    ).fit(cov_type="HC3")
-    return model
+    covariates = [
+        "did",
+        "ilo_unemployment_rate_pct",
+        "foreigners_share_pct",
+    ]
+    return _fit_twoway_fe(panel, "crime_rate_per_100k", covariates)
 
 
 
 # Event-study model
 
-def fit_event_study(panel: pd.DataFrame, ref_year: int = 2015) -> RegressionResults:
+def fit_event_study(panel: pd.DataFrame, ref_year: int = 2015) -> OLSResults:
     """
     Fit an event-study model with region FE and year FE interacted with treatment.
 
@@ -116,6 +417,10 @@ def fit_event_study(panel: pd.DataFrame, ref_year: int = 2015) -> RegressionResu
                             + C(year, Treatment(reference=ref_year)) : treated
 
     This allows to extract dynamic treatment effects relative to the reference year.
+    Region and year fixed effects are absorbed by a within transformation, and
+    the interaction for ref_year is omitted so every effect is measured
+    relative to it. Coefficients keep the patsy-style names, e.g.
+    'C(year, Treatment(reference=2015))[2018]:treated'.
 
     Parameters
     ----------
@@ -130,29 +435,29 @@ def fit_event_study(panel: pd.DataFrame, ref_year: int = 2015) -> RegressionResu
 
     Returns
     -------
-    RegressionResults
+    OLSResults
         Fitted OLS model with robust (HC3) standard errors.
     """
-    formula = (
-        "crime_rate_per_100k ~ "
-        "C(region) + "
-        f"C(year, Treatment(reference={ref_year})) + "
-        f"C(year, Treatment(reference={ref_year})):treated"
-    )
+    df = panel[["crime_rate_per_100k", "region", "year"]].copy()
+    year = panel["year"].to_numpy()
+    treated = panel["treated"].to_numpy()
 
-    model = smf.ols(
-        formula=formula,
-        data=panel,
-    ).fit(cov_type="HC3")
+    interactions = []
+    for y in np.unique(year):
+        if y == ref_year:
+            continue
+        name = f"C(year, Treatment(reference={ref_year}))[{y}]:treated"
+        df[name] = (year == y) * treated
+        interactions.append(name)
 
-    return model
+    return _fit_twoway_fe(df, "crime_rate_per_100k", interactions)
 
 
 
 # Parallel trends / pretrend
 
 
-def fit_pretrend_interaction(panel: pd.DataFrame, pre_cutoff_year: int = 2016) -> RegressionResults:
+def fit_pretrend_interaction(panel: pd.DataFrame, pre_cutoff_year: int = 2016) -> OLSResults:
     """
     Test for parallel pre-treatment trends by interacting treatment with a time trend
     in the pre-period only.
@@ -164,6 +469,8 @@ def fit_pretrend_interaction(panel: pd.DataFrame, pre_cutoff_year: int = 2016) -
 
     The key coefficient is treated:year_num. If it is not significantly
     different from zero, this supports the parallel trends assumption.
+    Region fixed effects are absorbed; the 'treated' main effect is
+    collinear with them and therefore not reported.
 
     Parameters
     ----------
@@ -178,25 +485,32 @@ def fit_pretrend_interaction(panel: pd.DataFrame, pre_cutoff_year: int = 2016) -
 
     Returns
     -------
-    RegressionResults
+    OLSResults
         Fitted OLS model with robust (HC3) standard errors.
     """
-    pre = panel[panel["year"] < pre_cutoff_year].copy()
-    pre["year_num"] = pre["year"] - pre["year"].min()
-
-    model = smf.ols(
-        formula="crime_rate_per_100k ~ treated * year_num + C(region)",
-        data=pre,
-    ).fit(cov_type="HC3")
+    pre = panel.loc[
+        panel["year"] < pre_cutoff_year,
+        ["crime_rate_per_100k", "region", "year", "treated"],
+    ]
+    year_num = pre["year"] - pre["year"].min()
+    pre = pre.assign(
+        year_num=year_num,
+        **{"treated:year_num": pre["treated"] * year_num},
+    )
 
-    return model
+    return _fit_twoway_fe(
+        pre,
+        "crime_rate_per_100k",
+        ["year_num", "treated:year_num"],
+        fe2=None,
+    )
 
 
 
 # Placebo DiD
 
 
-def fit_placebo_did(panel: pd.DataFrame, fake_treatment_year: int = 2013) -> RegressionResults:
+def fit_placebo_did(panel: pd.DataFrame, fake_treatment_year: int = 2013) -> OLSResults:
     """
     Fit a placebo DID model by changing the treatment year to a fake year.
 
@@ -221,27 +535,40 @@ def fit_placebo_did(panel: pd.DataFrame, fake_treatment_year: int = 2013) -> Reg
 
     Returns
     -------
-    RegressionResults
+    OLSResults
         Fitted OLS model with robust (HC3) standard errors.
     """
-    df = panel.copy()
+    # Only the columns used by the fit, not a copy of the whole panel
+    fake_post = (panel["year"] >= fake_treatment_year).astype(int)
+    df = panel[["crime_rate_per_100k", "region", "year"]].assign(
+        fake_did=panel["treated"] * fake_post,
+    )
 
-    df["fake_post"] = (df["year"] >= fake_treatment_year).astype(int)
-    df["fake_did"] = df["treated"] * df["fake_post"]
+    return _fit_twoway_fe(df, "crime_rate_per_100k", ["fake_did"])
 
-    model = smf.ols(
-        formula="crime_rate_per_100k ~ fake_did + C(region) + C(year)",
-        data=df,
-    ).fit(cov_type="HC3")
 
-    return model
 
+# Threshold-based model
 
 
-# Threshold-based model
+def _intensity_2016_by_region(panel: pd.DataFrame, regions: pd.Index) -> np.ndarray:
+    """
+    treatment_intensity in 2016 for each region, aligned with the region
+    codes from _factorize (NaN for regions without a 2016 row).
+    """
+    return (
+        panel.loc[panel["year"] == 2016]
+        .set_index("region")["treatment_intensity"]
+        .reindex(regions)
+        .to_numpy(dtype=float)
+    )
 
 
-def run_did_with_threshold(panel: pd.DataFrame, threshold: float) -> RegressionResults:
+def run_did_with_threshold(
+    panel: pd.DataFrame,
+    threshold: float,
+    se: SEType = "HC3",
+) -> OLSResults:
     """
     Re-estimate the DID model using an alternative treatment threshold
     on treatment_intensity in year 2016.
@@ -263,34 +590,33 @@ def run_did_with_threshold(panel: pd.DataFrame, threshold: float) -> RegressionR
         - 'region'
     threshold : float
         Threshold value applied to treatment_intensity in 2016.
+    se : {"HC3", "classical", "none"}, default "HC3"
+        Standard errors to compute. "classical" skips the per-row leverage
+        pass; "none" only estimates the coefficient (SE and p-value are NaN).
 
     Returns
     -------
-    RegressionResults
-        Fitted OLS model with robust (HC3) standard errors.
+    OLSResults
+        Fitted OLS model with the requested standard errors.
     """
-    df = panel.copy()
+    region_codes, regions = _factorize(panel["region"])
+    ti_2016 = _intensity_2016_by_region(panel, regions)
 
-    # treatment_intensity in 2016 by region
-    ti_2016 = (
-        df[df["year"] == 2016]
-        .set_index("region")["treatment_intensity"]
-    )
-
-    treated_regions_alt = (ti_2016 > threshold).astype(int)
-
-    df["treated_alt"] = df["region"].map(treated_regions_alt).fillna(0).astype(int)
-    df["did_alt"] = df["treated_alt"] * df["post"]
+    treated_alt = (ti_2016 > threshold).astype(int)[region_codes]
 
-    model = smf.ols(
-        formula="crime_rate_per_100k ~ did_alt + C(region) + C(year)",
-        data=df,
-    ).fit(cov_type="HC3")
+    # Only the columns used by the fit, not a copy of the whole panel
+    df = panel[["crime_rate_per_100k", "region", "year"]].assign(
+        did_alt=treated_alt * panel["post"],
+    )
 
-    return model
+    return _fit_twoway_fe(df, "crime_rate_per_100k", ["did_alt"], se=se)
 
 
-def run_threshold_grid(panel: pd.DataFrame,thresholds: dict[str, float]) -> pd.DataFrame:
+def run_threshold_grid(
+    panel: pd.DataFrame,
+    thresholds: dict[str, float],
+    se: SEType = "HC3",
+) -> pd.DataFrame:
     """
     Run DID models for a grid of thresholds and collect the main effect.
 
@@ -300,6 +626,9 @@ def run_threshold_grid(panel: pd.DataFrame,thresholds: dict[str, float]) -> pd.D
         Panel with treatment_intensity, post, region, year, crime_rate_per_100k.
     thresholds : dict[str, float]
         Mapping from a label (e.g. "p40", "p50", "p60") to a numeric threshold.
+    se : {"HC3", "classical", "none"}, default "HC3"
+        Standard errors to compute, see run_did_with_threshold(). Use "none"
+        when only the coefficient path is needed.
 
     Returns
     -------
@@ -308,15 +637,44 @@ def run_threshold_grid(panel: pd.DataFrame,thresholds: dict[str, float]) -> pd.D
         - 'name': threshold label
         - 'threshold': numeric threshold
         - 'coef_did_alt': coefficient for did_alt
-        - 'se_did_alt': robust standard error
-        - 'pvalue_did_alt': p-value
+        - 'se_did_alt': standard error (robust for HC3, NaN for "none")
+        - 'pvalue_did_alt': p-value (NaN for "none")
     """
+    _check_se(se)
+
+    # Outcome and fixed effects do not depend on the threshold:
+    # absorb them once and only re-demean did_alt inside the loop.
+    df = panel[["crime_rate_per_100k", "post", "region", "year"]].dropna()
+    n = len(df)
+
+    region_codes, regions = _factorize(df["region"])
+    year_codes = _factorize(df["year"])[0]
+    h_fe = _twoway_fe_leverage(region_codes, year_codes) if se == "HC3" else None
+    df_resid = n - 1 - (len(regions) + year_codes.max())
+    y = _demean_twoway(
+        df["crime_rate_per_100k"].to_numpy(), region_codes, year_codes
+    )[:, 0]
+    post = df["post"].to_numpy()
+
+    ti_2016 = _intensity_2016_by_region(panel, regions)
+
     rows = []
 
     for name, thr in thresholds.items():
-        model = run_did_with_threshold(panel, thr)
+        did_alt = (ti_2016 > thr)[region_codes] * post
+        X = _demean_twoway(did_alt, region_codes, year_codes)
+
+        # A threshold that treats no region, or all of them, leaves did_alt
+        # spanned by the fixed effects: the row is NaN instead of an error
+        beta, cov = _ols_fit(
+            X, y, h_absorbed=h_fe, se=se, df_resid=df_resid,
+            x_scale=np.linalg.norm([did_alt], axis=1),
+        )
+        model = _make_results(
+            ["did_alt"], beta, cov, n, df_resid, use_t=(se == "classical")
+        )
         coef = model.params.get("did_alt", np.nan)
-        se = model.bse.get("did_alt", np.nan)
+        bse = model.bse.get("did_alt", np.nan)
         pval = model.pvalues.get("did_alt", np.nan)
 
         rows.append(
@@ -324,7 +682,7 @@ def run_threshold_grid(panel: pd.DataFrame,thresholds: dict[str, float]) -> pd.D
                 "name": name,
                 "threshold": thr,
                 "coef_did_alt": coef,
-                "se_did_alt": se,
+                "se_did_alt": bse,
                 "pvalue_did_alt": pval,
             }
         )
@@ -6,7 +6,8 @@ from typing import Optional, Union, Tuple
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from statsmodels.regression.linear_model import RegressionResults
+from matplotlib.collections import LineCollection
+from .models import OLSResults
 import re
 
 
@@ -26,7 +27,7 @@ def compute_parallel_trends_data(
     panel : pd.DataFrame
         Must contain:
         - 'year'
-        - 'treated'
+        - 'treated' (0/1)
         - outcome column (default: crime_rate_per_100k)
     outcome : str
         Outcome column name.
@@ -45,11 +46,24 @@ def compute_parallel_trends_data(
     if missing:
         raise ValueError(f"panel is missing required columns: {missing}")
 
-    grouped = (
-        panel
-        .groupby(["year", "treated"], as_index=False)[outcome]
-        .mean()
-        .rename(columns={outcome: "mean"})
+    # Means over an encoded (year, treated) key with a single bincount
+    values = panel[outcome].to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    year_codes, years = pd.factorize(panel["year"].to_numpy()[valid], sort=True)
+    treated = panel["treated"].to_numpy()[valid].astype(np.intp)
+
+    key = year_codes * 2 + treated
+    n_keys = 2 * len(years)
+    sums = np.bincount(key, weights=values[valid], minlength=n_keys)
+    counts = np.bincount(key, minlength=n_keys)
+
+    observed = np.flatnonzero(counts)
+    grouped = pd.DataFrame(
+        {
+            "year": years[observed // 2],
+            "treated": observed % 2,
+            "mean": sums[observed] / counts[observed],
+        }
     )
 
     return grouped
@@ -124,10 +138,12 @@ def plot_parallel_trends(
 _EVENT_PATTERN = re.compile(
     r"C\(year, Treatment\(reference=\d+\)\)\[(?P<year>\d+)\]:treated"
 )
+_EVENT_PREFIX = "C(year, Treatment(reference="
+_EVENT_SUFFIX = ":treated"
 
 
 def build_event_study_table(
-    event_model: RegressionResults,
+    event_model: OLSResults,
     ref_year: int,
 ) -> pd.DataFrame:
     """
@@ -145,7 +161,7 @@ def build_event_study_table(
 
     Parameters
     ----------
-    event_model : RegressionResults
+    event_model : OLSResults
         Fitted model from fit_event_study().
     ref_year : int
         Reference year used in the Treatment(reference=...)
@@ -169,65 +185,57 @@ def build_event_study_table(
     conf = event_model.conf_int()
     conf.columns = ["ci_low", "ci_high"]
 
-    rows = []
+    # Select event-study terms on the whole index at once: cheap
+    # prefix/suffix checks first, then parse the year from the survivors
+    names = params.index.to_series()
+    candidates = names[
+        names.str.startswith(_EVENT_PREFIX) & names.str.endswith(_EVENT_SUFFIX)
+    ]
+    years = candidates.str.extract(_EVENT_PATTERN)["year"].dropna()
 
-    for name, coef in params.items():
-        match = _EVENT_PATTERN.match(name)
-        if not match:
-            continue
-
-        year = int(match.group("year"))
-        se = se_series.get(name, np.nan)
-        pvalue = pvals.get(name, np.nan)
-
-        if name in conf.index:
-            ci_low = conf.loc[name, "ci_low"]
-            ci_high = conf.loc[name, "ci_high"]
-        else:
-            ci_low = np.nan
-            ci_high = np.nan
-        
-        rel_year = year - ref_year
-
-        rows.append(
-            {
-                "year": year,
-                "rel_year": rel_year,
-                "coef": coef,
-                "se": se,
-                "pvalue": pvalue,
-                "ci_low": ci_low,
-                "ci_high": ci_high,
-            }
-        )
-
-    if not rows:
+    if years.empty:
         raise ValueError(
             "No event-study coefficients found. "
             "Check that fit_event_study() was used to estimate the model."
         )
 
-    df = pd.DataFrame(rows)
-
-    # Add reference year with effect = 0 for plotting
-    if not (df["year"] == ref_year).any():
+    sel = years.index
+    year = years.astype(int).to_numpy()
+
+    columns = {
+        "year": year,
+        "rel_year": year - ref_year,
+        "coef": params.loc[sel].to_numpy(dtype=float),
+        "se": se_series.reindex(sel).to_numpy(dtype=float),
+        "pvalue": pvals.reindex(sel).to_numpy(dtype=float),
+        "ci_low": conf["ci_low"].reindex(sel).to_numpy(dtype=float),
+        "ci_high": conf["ci_high"].reindex(sel).to_numpy(dtype=float),
+    }
+
+    # Add reference year with effect = 0 for plotting; appended to the
+    # column arrays so the dataframe is built only once
+    if not (year == ref_year).any():
         ref_row = {
             "year": ref_year,
             "rel_year": 0,
             "coef": 0.0,
             "se": np.nan,
+            "pvalue": np.nan,
             "ci_low": np.nan,
             "ci_high": np.nan,
         }
-        df = pd.concat([df, pd.DataFrame([ref_row])], ignore_index=True)
+        columns = {
+            col: np.append(values, ref_row[col]) for col, values in columns.items()
+        }
 
-    df = df.sort_values("rel_year").reset_index(drop=True)
+    order = np.argsort(columns["rel_year"], kind="stable")
+    df = pd.DataFrame({col: values[order] for col, values in columns.items()})
     df["pvalue"] = df["pvalue"].round(3)
     return df
 
 
 def plot_event_study(
-    event_model: RegressionResults,
+    event_model: OLSResults,
     ref_year: int,
     ax: Optional[plt.Axes] = None,
     save_path: Optional[Union[str, Path]] = None,
@@ -237,7 +245,7 @@ def plot_event_study(
 
     Parameters
     ----------
-    event_model : RegressionResults
+    event_model : OLSResults
         Fitted model from fit_event_study().
     ref_year : int
         Reference year used for Treatment(reference=...).
@@ -335,13 +343,13 @@ def compute_treatment_intensity_distribution(
     if "treated" in panel.columns:
         cols.append("treated")
 
-    df_year = panel.loc[panel["year"] == year, cols].copy()
+    df_year = panel.loc[panel["year"] == year, cols]
     df_year = df_year.dropna(subset=[intensity_col])
 
     if df_year.empty:
         raise ValueError(f"No rows found for year {year} with non-null {intensity_col}.")
 
-    threshold = df_year[intensity_col].median()
+    threshold = np.median(df_year[intensity_col].to_numpy(dtype=float))
 
     return df_year, float(threshold)
 
@@ -386,22 +394,28 @@ def plot_treatment_intensity(
 
     fig, ax = plt.subplots(figsize=(10, 6))
 
-    ax.hlines(
-        y=df["region"],
-        xmin=0,
-        xmax=df["treatment_intensity"],
-        color="gray",
-        alpha=0.5,
-        linewidth=1.5,
+    # One LineCollection for all stems instead of per-region hlines
+    n = len(df)
+    y_pos = np.arange(n)
+    intensity = df["treatment_intensity"].to_numpy()
+    segments = np.stack(
+        [np.column_stack([np.zeros(n), y_pos]), np.column_stack([intensity, y_pos])],
+        axis=1,
+    )
+    ax.add_collection(
+        LineCollection(segments, colors="gray", alpha=0.5, linewidth=1.5)
     )
 
     ax.scatter(
-        df["treatment_intensity"],
-        df["region"],
+        intensity,
+        y_pos,
         s=80,
         c=colors,
         label="Regions",
     )
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(df["region"])
+    ax.autoscale_view()
 
 
     ax.axvline(
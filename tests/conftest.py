@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Make src/ importable without installing the package (as the notebook does)
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.append(str(SRC_DIR))
@@ -0,0 +1,16 @@
+import pandas as pd
+import pytest
+
+from refugees_did import design
+
+
+def test_load_panel_rebuilds_corrupt_parquet_cache(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    cache = tmp_path / "panel.parquet"
+    cache.write_bytes(b"not a parquet file")
+    monkeypatch.setattr(design, "PANEL_PARQUET", cache)
+
+    panel = design.load_panel()
+
+    assert len(panel) > 0
+    pd.testing.assert_frame_equal(pd.read_parquet(cache), panel)
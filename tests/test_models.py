@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from refugees_did import models as md
+from refugees_did.design import load_and_prepare
+
+
+@pytest.fixture(scope="module")
+def panel():
+    return load_and_prepare()
+
+
+@pytest.fixture(scope="module")
+def intensity_2016(panel):
+    return panel.loc[panel["year"] == 2016, "treatment_intensity"]
+
+
+@pytest.mark.parametrize("se", ["HC3", "classical", "none"])
+def test_threshold_grid_extremes_are_nan(panel, intensity_2016, se):
+    # Above the maximum no region is treated, below the minimum all are:
+    # either way did_alt is absorbed by the fixed effects
+    thresholds = {
+        "none_treated": float(intensity_2016.max()),
+        "all_treated": float(intensity_2016.min()) - 1.0,
+        "median": float(intensity_2016.median()),
+    }
+    grid = md.run_threshold_grid(panel, thresholds, se=se).set_index("name")
+
+    for name in ["none_treated", "all_treated"]:
+        assert np.isnan(grid.loc[name, "coef_did_alt"])
+        assert np.isnan(grid.loc[name, "se_did_alt"])
+        assert np.isnan(grid.loc[name, "pvalue_did_alt"])
+
+    assert np.isfinite(grid.loc["median", "coef_did_alt"])
+
+
+def test_threshold_extremes_single_fit(panel, intensity_2016):
+    for thr in [float(intensity_2016.max()), float(intensity_2016.min()) - 1.0]:
+        model = md.run_did_with_threshold(panel, thr)
+        assert np.isnan(model.params["did_alt"])
+        assert np.isnan(model.bse["did_alt"])
+
+
+def test_collinear_regressor_does_not_affect_others(panel):
+    # 'treated' is constant within region, so the region FE absorb it
+    model = md._fit_twoway_fe(panel, "crime_rate_per_100k", ["treated", "did"])
+    main = md.fit_main_did(panel)
+
+    assert np.isnan(model.params["treated"])
+    assert model.params["did"] == pytest.approx(main.params["did"], rel=1e-5)
+    assert model.bse["did"] == pytest.approx(main.bse["did"], rel=1e-5)
+
+
+def test_demean_twoway_warns_without_convergence():
+    rng = np.random.default_rng(0)
+    codes1 = rng.integers(0, 20, 300)
+    codes2 = rng.integers(0, 15, 300)
+    X = rng.normal(size=(300, 2))
+
+    with pytest.warns(UserWarning, match="not fully absorbed"):
+        md._demean_twoway(X, codes1, codes2, max_iter=2)